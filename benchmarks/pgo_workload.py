@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Training workload for a profile-guided build of the C extension.
+
+Exercises pack_basic/unpack_basic over a mix of payload shapes so the
+collected profile reflects typical use. See setup.py for the build steps.
+
+Run: PYTHONPATH=. python benchmarks/pgo_workload.py
+"""
+
+import typepack
+
+
+def make_payloads() -> list:
+    """Build representative payloads of each supported basic type."""
+    records = [
+        {
+            "id": i,
+            "name": f"user{i}",
+            "email": f"user{i}@example.com",
+            "active": i % 2 == 0,
+            "score": i * 1.5,
+            "balance": -i * 1000,
+            "tags": ["python", "developer"],
+            "parent": None,
+        }
+        for i in range(100)
+    ]
+
+    return [
+        {"name": "Ana", "age": 30, "active": True},
+        {"status": "success", "data": records, "total": len(records)},
+        list(range(-1000, 70000, 7)),
+        [i * 0.25 for i in range(1000)],
+        [2**40 + i for i in range(200)],
+        ["x" * n for n in range(0, 300, 3)],
+        "ç" * 5000,
+        b"\x00\x01" * 40000,
+        [[[[{"a": [1, 2, {"b": [3]}]}]]]] * 50,
+    ]
+
+
+def run(iterations: int = 200) -> None:
+    """Pack and unpack every payload repeatedly."""
+    payloads = make_payloads()
+    for _ in range(iterations):
+        for value in payloads:
+            typepack.unpack_basic(typepack.pack_basic(value))
+
+
+if __name__ == "__main__":
+    run()
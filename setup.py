@@ -3,8 +3,23 @@ Setup script for fastpack C extension.
 
 The C extension is optional - if the build fails (no compiler, etc.),
 the package will still work using the pure Python implementation.
+
+Optional, non-portable build flags (not used on Windows):
+
+    TYPEPACK_NATIVE=1          tune for this CPU and enable LTO (GCC/Clang)
+    TYPEPACK_PGO=generate      build an instrumented extension (GCC only)
+    TYPEPACK_PGO=use           rebuild using the collected profile (GCC only)
+
+A profile-guided build runs the training workload in between. The steps
+rely on GCC writing .gcda files that -fprofile-use reads directly; Clang
+needs an llvm-profdata merge step and is not supported here:
+
+    TYPEPACK_PGO=generate python setup.py build_ext --inplace --force
+    PYTHONPATH=. python benchmarks/pgo_workload.py
+    TYPEPACK_PGO=use python setup.py build_ext --inplace --force
 """
 
+import os
 import sys
 from setuptools import setup, Extension
 from setuptools.command.build_ext import build_ext
@@ -21,11 +36,39 @@ class BuildExtOptional(build_ext):
             print("*** typepack will use pure Python implementation instead.\n")
 
 
+def _build_flags():
+    """Return (compile_args, link_args) for the C extension."""
+    if sys.platform == "win32":
+        return ["/O2"], []
+
+    compile_args = ["-O3"]
+    link_args = []
+
+    if os.environ.get("TYPEPACK_NATIVE") == "1":
+        compile_args += ["-march=native", "-flto", "-fno-plt"]
+        link_args += ["-flto"]
+
+    pgo = os.environ.get("TYPEPACK_PGO")
+    if pgo == "generate":
+        compile_args.append("-fprofile-generate")
+        link_args.append("-fprofile-generate")
+    elif pgo == "use":
+        compile_args += ["-fprofile-use", "-fprofile-correction"]
+        link_args.append("-fprofile-use")
+    elif pgo:
+        raise ValueError(f"TYPEPACK_PGO must be 'generate' or 'use', got {pgo!r}")
+
+    return compile_args, link_args
+
+
+_compile_args, _link_args = _build_flags()
+
 # Define the C extension
 _typepack_ext = Extension(
     "typepack._typepack",
     sources=["src/_typepack.c"],
-    extra_compile_args=["-O3"] if sys.platform != "win32" else ["/O2"],
+    extra_compile_args=_compile_args,
+    extra_link_args=_link_args,
 )
 
 
@@ -4,12 +4,13 @@
  * This module provides high-performance binary serialization
  * using Python 3.15+ PyBytesWriter C API for efficient byte buffer management.
  *
- * For Python < 3.15, the pure Python implementation is used as fallback.
+ * For Python < 3.15, a growable PyMem-managed buffer is used instead.
  */
 
 #define PY_SSIZE_T_CLEAN
 #include <Python.h>
 #include <stdint.h>
+#include <string.h>
 
 /* Check for PyBytesWriter availability (Python 3.15+) */
 #if PY_VERSION_HEX >= 0x030F0000
@@ -68,63 +69,293 @@
 #define EXT_NAMEDTUPLE  0x0C
 #define EXT_CUSTOM      0x0D
 
-/* Helper macros for big-endian encoding */
-#define WRITE_BE16(buf, val) do { \
-    (buf)[0] = (uint8_t)((val) >> 8); \
-    (buf)[1] = (uint8_t)(val); \
-} while(0)
-
-#define WRITE_BE32(buf, val) do { \
-    (buf)[0] = (uint8_t)((val) >> 24); \
-    (buf)[1] = (uint8_t)((val) >> 16); \
-    (buf)[2] = (uint8_t)((val) >> 8); \
-    (buf)[3] = (uint8_t)(val); \
-} while(0)
-
-#define WRITE_BE64(buf, val) do { \
-    (buf)[0] = (uint8_t)((val) >> 56); \
-    (buf)[1] = (uint8_t)((val) >> 48); \
-    (buf)[2] = (uint8_t)((val) >> 40); \
-    (buf)[3] = (uint8_t)((val) >> 32); \
-    (buf)[4] = (uint8_t)((val) >> 24); \
-    (buf)[5] = (uint8_t)((val) >> 16); \
-    (buf)[6] = (uint8_t)((val) >> 8); \
-    (buf)[7] = (uint8_t)(val); \
-} while(0)
-
-/* Helper macros for big-endian decoding */
-#define READ_BE16(buf) \
-    (((uint16_t)(buf)[0] << 8) | (uint16_t)(buf)[1])
-
-#define READ_BE32(buf) \
-    (((uint32_t)(buf)[0] << 24) | ((uint32_t)(buf)[1] << 16) | \
-     ((uint32_t)(buf)[2] << 8) | (uint32_t)(buf)[3])
-
-#define READ_BE64(buf) \
-    (((uint64_t)(buf)[0] << 56) | ((uint64_t)(buf)[1] << 48) | \
-     ((uint64_t)(buf)[2] << 40) | ((uint64_t)(buf)[3] << 32) | \
-     ((uint64_t)(buf)[4] << 24) | ((uint64_t)(buf)[5] << 16) | \
-     ((uint64_t)(buf)[6] << 8) | (uint64_t)(buf)[7])
+/*
+ * Big-endian loads and stores.
+ *
+ * Each is a single (possibly unaligned) access through memcpy plus a byte
+ * swap on little-endian hosts. Compilers do not reliably turn the portable
+ * shift-and-or form into a bswap, so use the builtins where available.
+ */
+#if PY_BIG_ENDIAN
+#define BSWAP16(x) (x)
+#define BSWAP32(x) (x)
+#define BSWAP64(x) (x)
+#elif defined(__GNUC__) || defined(__clang__)
+#define BSWAP16(x) __builtin_bswap16(x)
+#define BSWAP32(x) __builtin_bswap32(x)
+#define BSWAP64(x) __builtin_bswap64(x)
+#elif defined(_MSC_VER)
+#include <stdlib.h>
+#define BSWAP16(x) _byteswap_ushort(x)
+#define BSWAP32(x) _byteswap_ulong(x)
+#define BSWAP64(x) _byteswap_uint64(x)
+#else
+#define BSWAP16(x) ((uint16_t)(((x) >> 8) | ((x) << 8)))
+#define BSWAP32(x) \
+    ((((x) & 0xFF000000u) >> 24) | (((x) & 0x00FF0000u) >> 8) | \
+     (((x) & 0x0000FF00u) << 8) | (((x) & 0x000000FFu) << 24))
+#define BSWAP64(x) \
+    (((uint64_t)BSWAP32((uint32_t)(x)) << 32) | \
+     (uint64_t)BSWAP32((uint32_t)((x) >> 32)))
+#endif
+
+static inline void
+store_be16(uint8_t *buf, uint16_t val)
+{
+    val = BSWAP16(val);
+    memcpy(buf, &val, 2);
+}
+
+static inline void
+store_be32(uint8_t *buf, uint32_t val)
+{
+    val = BSWAP32(val);
+    memcpy(buf, &val, 4);
+}
+
+static inline void
+store_be64(uint8_t *buf, uint64_t val)
+{
+    val = BSWAP64(val);
+    memcpy(buf, &val, 8);
+}
+
+static inline uint16_t
+load_be16(const uint8_t *buf)
+{
+    uint16_t val;
+    memcpy(&val, buf, 2);
+    return BSWAP16(val);
+}
+
+static inline uint32_t
+load_be32(const uint8_t *buf)
+{
+    uint32_t val;
+    memcpy(&val, buf, 4);
+    return BSWAP32(val);
+}
+
+static inline uint64_t
+load_be64(const uint8_t *buf)
+{
+    uint64_t val;
+    memcpy(&val, buf, 8);
+    return BSWAP64(val);
+}
+
+#define WRITE_BE16(buf, val) store_be16((buf), (uint16_t)(val))
+#define WRITE_BE32(buf, val) store_be32((buf), (uint32_t)(val))
+#define WRITE_BE64(buf, val) store_be64((buf), (uint64_t)(val))
+
+#define READ_BE16(buf) load_be16(buf)
+#define READ_BE32(buf) load_be32(buf)
+#define READ_BE64(buf) load_be64(buf)
 
 
+/*
+ * Output buffer abstraction.
+ *
+ * On Python 3.15+ the pack functions write through PyBytesWriter directly.
+ * On older versions they write into a growable char* buffer managed with
+ * PyMem_Realloc, which is copied into a bytes object once packing is done.
+ */
+
 #if HAVE_PYBYTESWRITER
 
+typedef PyBytesWriter Writer;
+
+#define writer_write PyBytesWriter_WriteBytes
+
+
+static inline int
+writer_write_with_header(Writer *writer, const uint8_t *header,
+                         Py_ssize_t header_size, const char *data,
+                         Py_ssize_t size)
+{
+    if (PyBytesWriter_WriteBytes(writer, header, header_size) < 0) {
+        return -1;
+    }
+    return PyBytesWriter_WriteBytes(writer, data, size);
+}
+
+#else /* !HAVE_PYBYTESWRITER */
+
+typedef struct {
+    char *buf;
+    Py_ssize_t pos;
+    Py_ssize_t capacity;
+} Writer;
+
 /*
- * Pack implementation using PyBytesWriter (Python 3.15+)
+ * Buffer pool: the buffer of the last finished pack() call is kept and
+ * handed to the next one, so steady-state packing does no malloc/free and
+ * rarely reallocs. The pool is emptied while a buffer is in use, so nested
+ * calls simply allocate their own. Buffers that grew past
+ * WRITER_POOL_MAX_SIZE are freed instead of pooled.
+ *
+ * The pool relies on the GIL and is disabled on free-threaded builds.
+ */
+#ifdef Py_GIL_DISABLED
+#define WRITER_POOL_ENABLED 0
+#else
+#define WRITER_POOL_ENABLED 1
+#endif
+
+#define WRITER_POOL_MAX_SIZE (1024 * 1024)
+
+static char *pooled_buf = NULL;
+static Py_ssize_t pooled_capacity = 0;
+
+
+static int
+writer_init(Writer *writer, Py_ssize_t capacity)
+{
+    writer->pos = 0;
+
+    if (WRITER_POOL_ENABLED && pooled_buf != NULL) {
+        writer->buf = pooled_buf;
+        writer->capacity = pooled_capacity;
+        pooled_buf = NULL;
+        pooled_capacity = 0;
+        if (writer->capacity >= capacity) {
+            return 0;
+        }
+        PyMem_Free(writer->buf);
+    }
+
+    writer->buf = PyMem_Malloc(capacity);
+    if (writer->buf == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    writer->capacity = capacity;
+    return 0;
+}
+
+
+static void
+writer_free(Writer *writer)
+{
+    if (WRITER_POOL_ENABLED && pooled_buf == NULL
+        && writer->capacity <= WRITER_POOL_MAX_SIZE) {
+        pooled_buf = writer->buf;
+        pooled_capacity = writer->capacity;
+    }
+    else {
+        PyMem_Free(writer->buf);
+    }
+    writer->buf = NULL;
+}
+
+
+static int
+writer_grow(Writer *writer, Py_ssize_t size)
+{
+    Py_ssize_t needed = writer->pos + size;
+    Py_ssize_t capacity = writer->capacity;
+
+    while (capacity < needed) {
+        if (capacity > PY_SSIZE_T_MAX / 2) {
+            capacity = needed;
+            break;
+        }
+        capacity *= 2;
+    }
+
+    char *buf = PyMem_Realloc(writer->buf, capacity);
+    if (buf == NULL) {
+        PyErr_NoMemory();
+        return -1;
+    }
+    writer->buf = buf;
+    writer->capacity = capacity;
+    return 0;
+}
+
+
+static inline int
+writer_write(Writer *writer, const void *bytes, Py_ssize_t size)
+{
+    if (writer->pos + size > writer->capacity) {
+        if (writer_grow(writer, size) < 0) {
+            return -1;
+        }
+    }
+    memcpy(writer->buf + writer->pos, bytes, size);
+    writer->pos += size;
+    return 0;
+}
+
+
+/* Payloads up to this size are copied with copy_small instead of memcpy */
+#define SMALL_COPY_MAX 32
+
+/*
+ * Copy a short payload 8 bytes at a time. A memcpy of constant size 8
+ * compiles to a single unaligned 64-bit load/store, which avoids a libc
+ * call for the many few-byte strings (dict keys, short values) we pack.
+ */
+static inline void
+copy_small(char *dst, const char *src, Py_ssize_t size)
+{
+    while (size >= 8) {
+        memcpy(dst, src, 8);
+        dst += 8;
+        src += 8;
+        size -= 8;
+    }
+    while (size > 0) {
+        *dst++ = *src++;
+        size--;
+    }
+}
+
+
+/* Write a str/bin header and its payload with a single capacity check */
+static inline int
+writer_write_with_header(Writer *writer, const uint8_t *header,
+                         Py_ssize_t header_size, const char *data,
+                         Py_ssize_t size)
+{
+    Py_ssize_t total = header_size + size;
+    if (writer->pos + total > writer->capacity) {
+        if (writer_grow(writer, total) < 0) {
+            return -1;
+        }
+    }
+
+    char *dst = writer->buf + writer->pos;
+    copy_small(dst, (const char *)header, header_size);
+    if (size <= SMALL_COPY_MAX) {
+        copy_small(dst + header_size, data, size);
+    }
+    else {
+        memcpy(dst + header_size, data, size);
+    }
+    writer->pos += total;
+    return 0;
+}
+
+#endif /* HAVE_PYBYTESWRITER */
+
+
+/*
+ * Pack implementation
  */
 
 /* Forward declarations */
-static int pack_value(PyBytesWriter *writer, PyObject *obj);
-static int pack_int(PyBytesWriter *writer, PyObject *obj);
-static int pack_float(PyBytesWriter *writer, PyObject *obj);
-static int pack_str(PyBytesWriter *writer, PyObject *obj);
-static int pack_bytes(PyBytesWriter *writer, PyObject *obj);
-static int pack_list(PyBytesWriter *writer, PyObject *obj);
-static int pack_dict(PyBytesWriter *writer, PyObject *obj);
+static int pack_value(Writer *writer, PyObject *obj);
+static int pack_int(Writer *writer, PyObject *obj);
+static int pack_float(Writer *writer, PyObject *obj);
+static int pack_str(Writer *writer, PyObject *obj);
+static int pack_bytes(Writer *writer, PyObject *obj);
+static int pack_list(Writer *writer, PyObject *obj);
+static int pack_dict(Writer *writer, PyObject *obj);
 
 
 static int
-pack_int(PyBytesWriter *writer, PyObject *obj)
+pack_int(Writer *writer, PyObject *obj)
 {
     int overflow;
     long long val = PyLong_AsLongLongAndOverflow(obj, &overflow);
@@ -135,59 +366,59 @@ pack_int(PyBytesWriter *writer, PyObject *obj)
         /* Positive fixint (0-127) */
         if (val >= 0 && val <= 127) {
             buf[0] = (uint8_t)val;
-            return PyBytesWriter_WriteBytes(writer, buf, 1);
+            return writer_write(writer, buf, 1);
         }
         /* Negative fixint (-32 to -1) */
         if (val >= -32 && val < 0) {
             buf[0] = (uint8_t)(val & 0xFF);
-            return PyBytesWriter_WriteBytes(writer, buf, 1);
+            return writer_write(writer, buf, 1);
         }
         /* uint8 */
         if (val >= 0 && val <= 0xFF) {
             buf[0] = MP_UINT8;
             buf[1] = (uint8_t)val;
-            return PyBytesWriter_WriteBytes(writer, buf, 2);
+            return writer_write(writer, buf, 2);
         }
         /* uint16 */
         if (val >= 0 && val <= 0xFFFF) {
             buf[0] = MP_UINT16;
             WRITE_BE16(buf + 1, (uint16_t)val);
-            return PyBytesWriter_WriteBytes(writer, buf, 3);
+            return writer_write(writer, buf, 3);
         }
         /* uint32 */
         if (val >= 0 && val <= 0xFFFFFFFF) {
             buf[0] = MP_UINT32;
             WRITE_BE32(buf + 1, (uint32_t)val);
-            return PyBytesWriter_WriteBytes(writer, buf, 5);
+            return writer_write(writer, buf, 5);
         }
         /* uint64 */
         if (val >= 0) {
             buf[0] = MP_UINT64;
             WRITE_BE64(buf + 1, (uint64_t)val);
-            return PyBytesWriter_WriteBytes(writer, buf, 9);
+            return writer_write(writer, buf, 9);
         }
         /* int8 */
         if (val >= -128) {
             buf[0] = MP_INT8;
             buf[1] = (uint8_t)(int8_t)val;
-            return PyBytesWriter_WriteBytes(writer, buf, 2);
+            return writer_write(writer, buf, 2);
         }
         /* int16 */
         if (val >= -32768) {
             buf[0] = MP_INT16;
             WRITE_BE16(buf + 1, (uint16_t)(int16_t)val);
-            return PyBytesWriter_WriteBytes(writer, buf, 3);
+            return writer_write(writer, buf, 3);
         }
         /* int32 */
         if (val >= -2147483648LL) {
             buf[0] = MP_INT32;
             WRITE_BE32(buf + 1, (uint32_t)(int32_t)val);
-            return PyBytesWriter_WriteBytes(writer, buf, 5);
+            return writer_write(writer, buf, 5);
         }
         /* int64 */
         buf[0] = MP_INT64;
         WRITE_BE64(buf + 1, (uint64_t)val);
-        return PyBytesWriter_WriteBytes(writer, buf, 9);
+        return writer_write(writer, buf, 9);
     }
 
     /* Handle overflow - try unsigned long long */
@@ -197,7 +428,7 @@ pack_int(PyBytesWriter *writer, PyObject *obj)
         uint8_t buf[9];
         buf[0] = MP_UINT64;
         WRITE_BE64(buf + 1, uval);
-        return PyBytesWriter_WriteBytes(writer, buf, 9);
+        return writer_write(writer, buf, 9);
     }
 
     PyErr_SetString(PyExc_OverflowError, "Integer too large to pack");
@@ -206,7 +437,7 @@ pack_int(PyBytesWriter *writer, PyObject *obj)
 
 
 static int
-pack_float(PyBytesWriter *writer, PyObject *obj)
+pack_float(Writer *writer, PyObject *obj)
 {
     double val = PyFloat_AS_DOUBLE(obj);
     uint8_t buf[9];
@@ -218,12 +449,12 @@ pack_float(PyBytesWriter *writer, PyObject *obj)
     u.d = val;
     buf[0] = MP_FLOAT64;
     WRITE_BE64(buf + 1, u.i);
-    return PyBytesWriter_WriteBytes(writer, buf, 9);
+    return writer_write(writer, buf, 9);
 }
 
 
 static int
-pack_str(PyBytesWriter *writer, PyObject *obj)
+pack_str(Writer *writer, PyObject *obj)
 {
     Py_ssize_t size;
     const char *data = PyUnicode_AsUTF8AndSize(obj, &size);
@@ -255,15 +486,12 @@ pack_str(PyBytesWriter *writer, PyObject *obj)
         header_size = 5;
     }
 
-    if (PyBytesWriter_WriteBytes(writer, header, header_size) < 0) {
-        return -1;
-    }
-    return PyBytesWriter_WriteBytes(writer, data, size);
+    return writer_write_with_header(writer, header, header_size, data, size);
 }
 
 
 static int
-pack_bytes(PyBytesWriter *writer, PyObject *obj)
+pack_bytes(Writer *writer, PyObject *obj)
 {
     Py_ssize_t size = PyBytes_GET_SIZE(obj);
     const char *data = PyBytes_AS_STRING(obj);
@@ -287,15 +515,12 @@ pack_bytes(PyBytesWriter *writer, PyObject *obj)
         header_size = 5;
     }
 
-    if (PyBytesWriter_WriteBytes(writer, header, header_size) < 0) {
-        return -1;
-    }
-    return PyBytesWriter_WriteBytes(writer, data, size);
+    return writer_write_with_header(writer, header, header_size, data, size);
 }
 
 
 static int
-pack_list(PyBytesWriter *writer, PyObject *obj)
+pack_list(Writer *writer, PyObject *obj)
 {
     Py_ssize_t size = PyList_GET_SIZE(obj);
     uint8_t header[5];
@@ -317,23 +542,29 @@ pack_list(PyBytesWriter *writer, PyObject *obj)
         header_size = 5;
     }
 
-    if (PyBytesWriter_WriteBytes(writer, header, header_size) < 0) {
+    if (writer_write(writer, header, header_size) < 0) {
+        return -1;
+    }
+
+    if (Py_EnterRecursiveCall(" while packing a list")) {
         return -1;
     }
 
     for (Py_ssize_t i = 0; i < size; i++) {
         PyObject *item = PyList_GET_ITEM(obj, i);
         if (pack_value(writer, item) < 0) {
+            Py_LeaveRecursiveCall();
             return -1;
         }
     }
 
+    Py_LeaveRecursiveCall();
     return 0;
 }
 
 
 static int
-pack_dict(PyBytesWriter *writer, PyObject *obj)
+pack_dict(Writer *writer, PyObject *obj)
 {
     Py_ssize_t size = PyDict_Size(obj);
     uint8_t header[5];
@@ -355,41 +586,44 @@ pack_dict(PyBytesWriter *writer, PyObject *obj)
         header_size = 5;
     }
 
-    if (PyBytesWriter_WriteBytes(writer, header, header_size) < 0) {
+    if (writer_write(writer, header, header_size) < 0) {
         return -1;
     }
 
     PyObject *key, *value;
     Py_ssize_t pos = 0;
 
+    if (Py_EnterRecursiveCall(" while packing a dict")) {
+        return -1;
+    }
+
     while (PyDict_Next(obj, &pos, &key, &value)) {
-        if (pack_value(writer, key) < 0) {
-            return -1;
-        }
-        if (pack_value(writer, value) < 0) {
+        if (pack_value(writer, key) < 0 || pack_value(writer, value) < 0) {
+            Py_LeaveRecursiveCall();
             return -1;
         }
     }
 
+    Py_LeaveRecursiveCall();
     return 0;
 }
 
 
 static int
-pack_value(PyBytesWriter *writer, PyObject *obj)
+pack_value(Writer *writer, PyObject *obj)
 {
     uint8_t marker;
 
     /* None */
     if (obj == Py_None) {
         marker = MP_NONE;
-        return PyBytesWriter_WriteBytes(writer, &marker, 1);
+        return writer_write(writer, &marker, 1);
     }
 
     /* Bool (must check before int, since bool is subclass of int) */
     if (PyBool_Check(obj)) {
         marker = (obj == Py_True) ? MP_TRUE : MP_FALSE;
-        return PyBytesWriter_WriteBytes(writer, &marker, 1);
+        return writer_write(writer, &marker, 1);
     }
 
     /* Int */
@@ -449,7 +683,10 @@ typepack_pack(PyObject *self, PyObject *args)
         return NULL;
     }
 
-    PyBytesWriter *writer = PyBytesWriter_Create(64);  /* Initial buffer size */
+#if HAVE_PYBYTESWRITER
+    /* Create(n) sets the writer size to n (not just its capacity), so start
+       empty and let PyBytesWriter_WriteBytes grow the buffer. */
+    PyBytesWriter *writer = PyBytesWriter_Create(0);
     if (writer == NULL) {
         return NULL;
     }
@@ -460,37 +697,23 @@ typepack_pack(PyObject *self, PyObject *args)
     }
 
     return PyBytesWriter_Finish(writer);
-}
-
-
-#else /* !HAVE_PYBYTESWRITER */
-
-/*
- * Fallback for Python < 3.15: Use bytearray
- */
-
-static PyObject *
-typepack_pack(PyObject *self, PyObject *args)
-{
-    /* Import and call the Python implementation */
-    PyObject *core_module = PyImport_ImportModule("typepack.core");
-    if (core_module == NULL) {
+#else
+    Writer writer;
+    if (writer_init(&writer, 64) < 0) {  /* Initial buffer size */
         return NULL;
     }
 
-    PyObject *pack_func = PyObject_GetAttrString(core_module, "pack");
-    Py_DECREF(core_module);
-    if (pack_func == NULL) {
+    if (pack_value(&writer, obj) < 0) {
+        writer_free(&writer);
         return NULL;
     }
 
-    PyObject *result = PyObject_Call(pack_func, args, NULL);
-    Py_DECREF(pack_func);
+    PyObject *result = PyBytes_FromStringAndSize(writer.buf, writer.pos);
+    writer_free(&writer);
     return result;
+#endif
 }
 
-#endif /* HAVE_PYBYTESWRITER */
-
 
 /*
  * Unpack implementation (works on all Python versions)
@@ -514,8 +737,9 @@ unpack_str(UnpackState *state, Py_ssize_t length)
         return NULL;
     }
 
-    PyObject *result = PyUnicode_FromStringAndSize(
-        (const char *)(state->data + state->offset), length);
+    /* Decode straight from the input buffer with strict error handling */
+    PyObject *result = PyUnicode_DecodeUTF8(
+        (const char *)(state->data + state->offset), length, NULL);
     state->offset += length;
     return result;
 }
@@ -542,6 +766,68 @@ unpack_array(UnpackState *state, Py_ssize_t length)
 }
 
 
+/*
+ * Key cache: map keys repeat across records of the same shape, so short
+ * ASCII fixstr keys are looked up by their encoded bytes in a small
+ * direct-mapped table before being decoded. Hits return the cached string,
+ * which skips the decode and makes repeated keys share one object.
+ *
+ * Like the buffer pool, the cache relies on the GIL and is disabled on
+ * free-threaded builds.
+ */
+#ifdef Py_GIL_DISABLED
+#define KEY_CACHE_ENABLED 0
+#else
+#define KEY_CACHE_ENABLED 1
+#endif
+
+#define KEY_CACHE_SIZE 256
+
+static PyObject *key_cache[KEY_CACHE_SIZE];
+
+
+static PyObject *
+unpack_key(UnpackState *state)
+{
+    if (!KEY_CACHE_ENABLED || state->offset >= state->size) {
+        return unpack_value(state);
+    }
+
+    uint8_t marker = state->data[state->offset];
+    if (marker < 0xA0 || marker > 0xBF) {
+        return unpack_value(state);
+    }
+
+    Py_ssize_t length = marker & 0x1F;
+    const uint8_t *start = state->data + state->offset + 1;
+    if (state->offset + 1 + length > state->size) {
+        return unpack_value(state);
+    }
+
+    /* FNV-1a over the key bytes picks the slot */
+    uint32_t hash = 2166136261u;
+    for (Py_ssize_t i = 0; i < length; i++) {
+        hash = (hash ^ start[i]) * 16777619u;
+    }
+    PyObject **slot = &key_cache[(hash ^ (hash >> 16)) & (KEY_CACHE_SIZE - 1)];
+
+    PyObject *cached = *slot;
+    if (cached != NULL && PyUnicode_GET_LENGTH(cached) == length
+        && memcmp(PyUnicode_DATA(cached), start, length) == 0) {
+        state->offset += 1 + length;
+        return Py_NewRef(cached);
+    }
+
+    state->offset += 1;
+    PyObject *key = unpack_str(state, length);
+    if (key != NULL && PyUnicode_IS_ASCII(key)) {
+        /* ASCII strings store exactly their encoded bytes */
+        Py_XSETREF(*slot, Py_NewRef(key));
+    }
+    return key;
+}
+
+
 static PyObject *
 unpack_map(UnpackState *state, Py_ssize_t length)
 {
@@ -551,7 +837,7 @@ unpack_map(UnpackState *state, Py_ssize_t length)
     }
 
     for (Py_ssize_t i = 0; i < length; i++) {
-        PyObject *key = unpack_value(state);
+        PyObject *key = unpack_key(state);
         if (key == NULL) {
             Py_DECREF(result);
             return NULL;
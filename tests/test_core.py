@@ -1,5 +1,8 @@
 """Tests for typepack core functionality."""
 
+import sys
+import sysconfig
+
 import pytest
 import typepack
 
@@ -113,6 +116,11 @@ class TestStrings:
         data = typepack.pack(value)
         assert typepack.unpack(data) == value
 
+    def test_str32(self):
+        value = "Olá 👋 " * 20000
+        data = typepack.pack(value)
+        assert typepack.unpack(data) == value
+
     def test_unicode(self):
         value = "Hello, world!"
         data = typepack.pack(value)
@@ -174,6 +182,20 @@ class TestLists:
         data = typepack.pack(value)
         assert typepack.unpack(data) == value
 
+    def test_float_array(self):
+        value = [i * 0.1 for i in range(100)] + [float("inf"), -0.0, 1e308]
+        data = typepack.pack(value)
+        assert data == typepack.pack_basic(value)
+        assert typepack.unpack(data) == value
+
+    def test_fixint_array(self):
+        small = [i % 128 for i in range(100)]
+        for value in (small, small + [128], small + [True], small + [-1]):
+            data = typepack.pack(value)
+            assert data == typepack.pack_basic(value)
+            assert typepack.unpack(data) == value
+        assert typepack.unpack(typepack.pack(small + [True]))[-1] is True
+
 
 class TestDicts:
     """Test dict serialization."""
@@ -213,6 +235,32 @@ class TestDicts:
         data = typepack.pack(value)
         assert typepack.unpack(data) == value
 
+    def test_repeated_keys_shared(self):
+        value = [{"id": 1, "name": "Ana"}, {"id": 2, "name": "Bruno"}]
+        first, second = typepack.unpack(typepack.pack(value))
+        assert first == value[0] and second == value[1]
+        for a, b in zip(first, second):
+            assert a is b
+
+    def test_key_cache_bounded(self):
+        from typepack import core
+
+        core._KEY_CACHE.clear()
+        count = core._KEY_CACHE_SIZE + 100
+        value = {f"bounded-key-{i}": i for i in range(count)}
+        result = typepack.unpack(typepack.pack(value))
+        assert result == value
+        assert len(core._KEY_CACHE) == core._KEY_CACHE_SIZE
+
+        # Keys decoded after the cache filled up are not interned
+        late_key = list(result)[-1]
+        assert sys.intern("".join(["bounded-key-", str(count - 1)])) is not late_key
+
+    def test_bytearray_input(self):
+        value = {"items": [1, 2, 3], "name": "Ana"}
+        data = bytearray(typepack.pack(value))
+        assert typepack.unpack(data) == value
+
 
 class TestComplexStructures:
     """Test complex nested structures."""
@@ -232,6 +280,29 @@ class TestComplexStructures:
         data = typepack.pack(value)
         assert typepack.unpack(data) == value
 
+    def test_deeply_nested(self):
+        value = [1]
+        for i in range(5000):
+            value = {"level": i, "child": [value]}
+        data = typepack.pack(value)
+        result = typepack.unpack(data)
+        for i in reversed(range(5000)):
+            assert result["level"] == i
+            result = result["child"][0]
+        assert result == [1]
+
+    def test_self_referencing_list(self):
+        value = [1]
+        value.append(value)
+        with pytest.raises(ValueError, match="Circular reference"):
+            typepack.pack(value)
+
+    def test_self_referencing_dict(self):
+        value = {"a": 1}
+        value["self"] = {"parent": [value]}
+        with pytest.raises(ValueError, match="Circular reference"):
+            typepack.pack(value)
+
 
 class TestErrors:
     """Test error handling."""
@@ -240,6 +311,11 @@ class TestErrors:
         with pytest.raises(TypeError):
             typepack.pack(object())
 
+    def test_integer_out_of_range(self):
+        for value in [2**64, -(2**63) - 1]:
+            with pytest.raises(OverflowError):
+                typepack.pack(value)
+
 
 class TestBinarySize:
     """Test that binary output is compact."""
@@ -251,3 +327,33 @@ class TestBinarySize:
         packed = typepack.pack(value)
         json_bytes = json.dumps(value).encode("utf-8")
         assert len(packed) < len(json_bytes)
+
+
+class TestBasicFunctions:
+    """Test pack_basic/unpack_basic (C accelerated when available)."""
+
+    def test_matches_pure_python(self):
+        value = {
+            "id": 12345,
+            "name": "Ana",
+            "score": 95.5,
+            "active": True,
+            "missing": None,
+            "negative": -70000,
+            "large": 2**64 - 1,
+            "raw": b"\x00\x01" * 200,
+            "text": "x" * 70000,
+            "items": list(range(100)),
+        }
+        packed = typepack.pack_basic(value)
+        assert packed == typepack.pack(value)
+        assert typepack.unpack_basic(packed) == value
+
+    def test_repeated_keys(self):
+        value = [{"id": i, "name": "Ana", "ção": i} for i in range(300)]
+        result = typepack.unpack_basic(typepack.pack_basic(value))
+        assert result == value
+        if not sysconfig.get_config_var("Py_GIL_DISABLED"):
+            # The C key cache is compiled out on free-threaded builds
+            first, last = list(result[0]), list(result[-1])
+            assert first[0] is last[0] and first[1] is last[1]
@@ -1,7 +1,10 @@
 """Tests for typepack extensibility features (v0.3.0)."""
 
+import gc
+import weakref
 import pytest
-from dataclasses import dataclass
+from collections import namedtuple
+from dataclasses import dataclass, make_dataclass
 from typing import NamedTuple
 
 import typepack
@@ -229,6 +232,87 @@ class TestRegister:
                 def __typepack_decode__(cls, data):
                     return cls()
 
+    def test_register_after_packing_unregistered(self):
+        @dataclass
+        class Item:
+            sku: str
+            qty: int
+
+        item = Item("A-1", 3)
+        assert typepack.unpack(typepack.pack(item))["__dataclass__"] == "Item"
+
+        typepack.register(Item)
+        result = typepack.unpack(typepack.pack(item))
+        assert result == item
+
+        typepack.clear_registry()
+        typepack.register(Item, type_code=0x40)
+        result = typepack.unpack(typepack.pack(item))
+        assert result == item
+
+    def test_packed_classes_can_be_collected(self):
+        refs = []
+        for i in range(3):
+            Row = namedtuple("Row", ["id", "name"])
+            Record = make_dataclass("Record", [("id", int), ("name", str)])
+            typepack.pack([Row(i, "a"), Record(i, "b")])
+            refs += [weakref.ref(Row), weakref.ref(Record)]
+        del Row, Record
+
+        gc.collect()
+        assert all(ref() is None for ref in refs)
+
+    def test_specialized_packers_match_dict_form(self):
+        from typepack import core
+
+        @dataclass
+        class Order:
+            sku: str
+            qty: int
+            tags: list
+            note: str = None
+
+        class Point(NamedTuple):
+            x: float
+            y: float
+            label: str
+
+        order = Order("A-1", 300, ["new", {"gift": True}], "x" * 40)
+        point = Point(1.5, -2.0, "origin")
+
+        for value, pack_dict in (
+            (order, core._pack_dataclass_dict),
+            (point, core._pack_namedtuple_dict),
+        ):
+            expected = bytearray()
+            pack_dict(value, expected)
+            assert typepack.pack(value) == bytes(expected)
+            assert core._SPECIALIZED_PACKERS[type(value)] is not pack_dict
+
+        typepack.register(Order)
+        typepack.register(Point)
+        for value in (order, point):
+            expected = bytearray()
+            core._pack_registered_dict(value, expected)
+            assert typepack.pack(value) == bytes(expected)
+            assert core._SPECIALIZED_PACKERS[type(value)] is not core._pack_registered_dict
+
+    def test_specialized_packer_fallback(self):
+        from typepack import core
+
+        # A field colliding with a header key keeps the dict-based packer
+        Clash = make_dataclass("Clash", [("__module__", str)])
+        value = Clash("x")
+        expected = bytearray()
+        core._pack_dataclass_dict(value, expected)
+        assert typepack.pack(value) == bytes(expected)
+        assert core._SPECIALIZED_PACKERS[Clash] is core._pack_dataclass_dict
+
+        header = {"__dataclass__": "Clash", "__module__": __name__}
+        for names in (["__module__"], ["not valid"], ["class"]):
+            packer = core._compile_packer(Clash, core._EXT_DATACLASS, header, None, names)
+            assert packer is None
+
     def test_register_without_encode_decode_raises(self):
         with pytest.raises(TypeError, match="must have __typepack_encode__"):
             @typepack.register
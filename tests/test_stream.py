@@ -68,6 +68,19 @@ class TestUnpackFrom:
         with pytest.raises(ValueError, match="Empty file"):
             typepack.unpack_from(buffer)
 
+    def test_unpack_from_bytearray_reader(self):
+        value = {"id": 123, "tags": ["a", "b"]}
+        buffer = BytearrayReader(typepack.pack(value))
+
+        assert typepack.unpack_from(buffer) == value
+
+
+class BytearrayReader(io.BytesIO):
+    """A reader whose read() returns bytearray, like some socket wrappers."""
+
+    def read(self, size=-1):
+        return bytearray(super().read(size))
+
 
 class TestPackStream:
     """Tests for pack_stream function."""
@@ -177,6 +190,14 @@ class TestUnpackStream:
         with pytest.raises(ValueError, match="reading data"):
             list(typepack.unpack_stream(buffer))
 
+    def test_unpack_stream_bytearray_reader(self):
+        items = [{"id": 1, "name": "Ana"}, {"id": 2, "name": "Bruno"}]
+        buffer = BytearrayReader()
+        typepack.pack_stream(items, buffer)
+        buffer.seek(0)
+
+        assert list(typepack.unpack_stream(buffer)) == items
+
 
 class TestPackMany:
     """Tests for pack_many function."""
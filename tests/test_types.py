@@ -5,6 +5,7 @@ from decimal import Decimal
 from enum import Enum
 from uuid import UUID
 
+import pytest
 import typepack
 
 
@@ -259,6 +260,44 @@ class TestEnum:
         assert result["value"] == "active"
 
 
+class TestQuantizedFloats:
+    """Test opt-in int8 quantization of float lists."""
+
+    def test_within_error_bound(self):
+        value = [i * 0.37 - 20.0 for i in range(200)]
+        data = typepack.pack(typepack.QuantizedFloats(value))
+        result = typepack.unpack(data)
+        assert isinstance(result, list)
+        bound = max(abs(v) for v in value) / 127 / 2 + 1e-6
+        assert all(abs(a - b) <= bound for a, b in zip(result, value))
+
+    def test_smaller_than_plain_list(self):
+        value = [i * 0.5 for i in range(1000)]
+        quantized = typepack.pack(typepack.QuantizedFloats(value))
+        assert len(quantized) * 8 < len(typepack.pack(value))
+
+    def test_zeros_and_empty(self):
+        for value in [[], [0.0, 0.0]]:
+            data = typepack.pack(typepack.QuantizedFloats(value))
+            assert typepack.unpack(data) == value
+
+    def test_non_finite_raises(self):
+        with pytest.raises(ValueError, match="finite"):
+            typepack.pack(typepack.QuantizedFloats([1.0, float("nan")]))
+
+    def test_extreme_magnitudes(self):
+        for amax in (1.5e-36, 1e-20, 1e20, 4.3e40):
+            value = [amax, -amax / 3, amax / 1000, 0.0]
+            result = typepack.unpack(typepack.pack(typepack.QuantizedFloats(value)))
+            bound = amax / 127 / 2 * (1 + 1e-6)
+            assert all(abs(a - b) <= bound for a, b in zip(result, value))
+
+    def test_out_of_range_raises(self):
+        for value in ([1e300, 1.0], [2.5e-43], [1e-50, 0.0]):
+            with pytest.raises(ValueError, match="max\\(abs\\)"):
+                typepack.pack(typepack.QuantizedFloats(value))
+
+
 class TestComplexStructures:
     """Test complex structures with new types."""
 
@@ -1,8 +1,8 @@
 """
 typepack - Fast, safe binary serialization for Python.
 
-Uses C extension with PyBytesWriter API (Python 3.15+) for maximum performance,
-with automatic fallback to pure Python implementation.
+Uses C extension (with the PyBytesWriter API on Python 3.15+) for maximum
+performance, with automatic fallback to pure Python implementation.
 
 Usage:
     >>> import typepack
@@ -53,7 +53,7 @@ except ImportError:
 
 # Import pure Python implementation
 from typepack.core import pack as _py_pack, unpack as _py_unpack
-from typepack.types import register, clear_registry
+from typepack.types import register, clear_registry, QuantizedFloats
 from typepack.stream import (
     pack_to,
     unpack_from,
@@ -122,6 +122,8 @@ __all__ = [
     # Type registry
     "register",
     "clear_registry",
+    # Lossy encodings
+    "QuantizedFloats",
     # Streaming
     "pack_to",
     "unpack_from",
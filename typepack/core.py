@@ -4,12 +4,16 @@ Core serialization functions for typepack.
 Binary format based on MessagePack specification for interoperability.
 """
 
+import keyword
+import math
 import struct
+import sys
+from array import array
 from dataclasses import is_dataclass, fields
 from datetime import datetime, date, time, timedelta
 from decimal import Decimal
 from enum import Enum
-from typing import Any, Type
+from typing import Any, Callable, Type
 from uuid import UUID
 
 from typepack import types as _types
@@ -26,12 +30,28 @@ _STRUCT_INT64 = struct.Struct(">q")
 _STRUCT_FLOAT64 = struct.Struct(">d")
 _STRUCT_FLOAT32 = struct.Struct(">f")
 
+# Marker byte fused with its payload, so each header/scalar is a single write
+_STRUCT_MARKER_UINT8 = struct.Struct(">BB")
+_STRUCT_MARKER_UINT16 = struct.Struct(">BH")
+_STRUCT_MARKER_UINT32 = struct.Struct(">BI")
+_STRUCT_MARKER_UINT64 = struct.Struct(">BQ")
+_STRUCT_MARKER_INT8 = struct.Struct(">Bb")
+_STRUCT_MARKER_INT16 = struct.Struct(">Bh")
+_STRUCT_MARKER_INT32 = struct.Struct(">Bi")
+_STRUCT_MARKER_INT64 = struct.Struct(">Bq")
+_STRUCT_MARKER_FLOAT64 = struct.Struct(">Bd")
+_STRUCT_EXT8_HEADER = struct.Struct(">BBB")
+_STRUCT_EXT16_HEADER = struct.Struct(">BHB")
+_STRUCT_EXT32_HEADER = struct.Struct(">BIB")
+
 # Pre-computed byte constants for common markers
 _BYTES_NONE = bytes([0xC0])
 _BYTES_FALSE = bytes([0xC2])
 _BYTES_TRUE = bytes([0xC3])
 _BYTES_FLOAT64 = bytes([0xCB])
 
+_LITTLE_ENDIAN = sys.byteorder == "little"
+
 
 # Format markers (MessagePack compatible)
 _NONE = 0xC0
@@ -58,6 +78,22 @@ _ARRAY32 = 0xDD
 _MAP16 = 0xDE
 _MAP32 = 0xDF
 
+# Integer (marker, packer) pairs indexed by bit length, so _pack_int picks
+# the smallest width with one lookup instead of a chain of range checks.
+# Unsigned: index is value.bit_length(). Signed: index is (~value).bit_length().
+_UINT_PACKERS = (
+    [(_UINT8, _STRUCT_MARKER_UINT8.pack)] * 9
+    + [(_UINT16, _STRUCT_MARKER_UINT16.pack)] * 8
+    + [(_UINT32, _STRUCT_MARKER_UINT32.pack)] * 16
+    + [(_UINT64, _STRUCT_MARKER_UINT64.pack)] * 32
+)
+_INT_PACKERS = (
+    [(_INT8, _STRUCT_MARKER_INT8.pack)] * 8
+    + [(_INT16, _STRUCT_MARKER_INT16.pack)] * 8
+    + [(_INT32, _STRUCT_MARKER_INT32.pack)] * 16
+    + [(_INT64, _STRUCT_MARKER_INT64.pack)] * 32
+)
+
 # Extension format markers
 _FIXEXT1 = 0xD4
 _FIXEXT2 = 0xD5
@@ -82,6 +118,44 @@ _EXT_ENUM = 0x0A
 _EXT_DATACLASS = 0x0B
 _EXT_NAMEDTUPLE = 0x0C
 _EXT_CUSTOM = 0x0D  # For registered custom types
+_EXT_QUANTIZED = 0x0E
+
+# Packed fixstr bytes for recently seen dict keys, which repeat across
+# records of the same shape. Bounded so arbitrary keys cannot grow it forever.
+_FIXSTR_CACHE: dict[str, bytes] = {}
+_FIXSTR_CACHE_SIZE = 1024
+
+# Decoded fixstr map keys by their encoded bytes, interned so that the same
+# key repeated across records is one shared str. Bounded like _FIXSTR_CACHE.
+_KEY_CACHE: dict[bytes, str] = {}
+_KEY_CACHE_SIZE = 1024
+
+# Strings at least this long are decoded through a memoryview, which avoids
+# copying the payload but costs more than a plain slice for short strings
+_ZERO_COPY_MIN_SIZE = 16384
+
+# Lists of at least this many floats are packed in bulk by _pack_float_items
+_FLOAT_ARRAY_MIN_SIZE = 32
+
+# Lists of at least this many ints are tried as a single run of fixints
+_FIXINT_ARRAY_MIN_SIZE = 16
+
+# Allowed max(abs) of a QuantizedFloats list (other than all zeros):
+# the scale max(abs) / 127 must be a normal float32, or samples round past
+# the int8 range (huge values) or lose the error bound (tiny values)
+_QUANTIZED_MIN_ABS = 127 * 2.0 ** -126
+_QUANTIZED_MAX_ABS = 127 * (2 - 2.0 ** -23) * 2.0 ** 127
+
+# Lists and dicts opened deeper than this in _pack_value are tracked by id
+# to detect cycles, which would otherwise grow its stack forever
+_CYCLE_CHECK_DEPTH = 1000
+
+# Pack functions cached per exact type by the dataclass, NamedTuple and
+# registered-type packers; owned by the registry so it can invalidate them
+_SPECIALIZED_PACKERS = _types._specialized_packers
+
+# Placeholder for a map key that has not been unpacked yet
+_NO_KEY = object()
 
 
 def pack(obj: Any) -> bytes:
@@ -127,10 +201,120 @@ def unpack(data: bytes) -> Any:
 
 
 def _pack_value(obj: Any, buffer: bytearray) -> None:
-    """Pack a single value into the buffer."""
-    # Local references for faster access
+    """
+    Pack a single value into the buffer.
+
+    Plain lists and dicts are walked with an explicit stack of iterators
+    rather than by recursion, and the most common scalars are packed inline,
+    so nested JSON-like data costs no extra Python frames per element.
+    """
+    # Module globals are used directly: CPython 3.11+ specializes global
+    # loads, and binding them (or bound methods) to locals on entry cost more
+    # on small payloads than it saved per element on large ones.
+    stack = []
+    # Containers open below _CYCLE_CHECK_DEPTH, by id, in stack order
+    deep_containers = None
+
+    while True:
+        cls = type(obj)
+
+        if cls is str:
+            encoded = obj.encode("utf-8")
+            length = len(encoded)
+            if length <= 31:
+                # Fixstr
+                buffer.append(0xA0 | length)
+            else:
+                _pack_str_header(length, buffer)
+            buffer += encoded
+
+        elif cls is int:
+            if 0 <= obj <= 127:
+                # Positive fixint
+                buffer.append(obj)
+            else:
+                _pack_int(obj, buffer)
+
+        elif cls is dict:
+            _pack_map_header(len(obj), buffer)
+            if obj:
+                stack.append((iter(obj.items()), True))
+                if len(stack) > _CYCLE_CHECK_DEPTH:
+                    deep_containers = _enter_container(obj, deep_containers)
+
+        elif cls is list:
+            length = len(obj)
+            _pack_array_header(length, buffer)
+            if (
+                length >= _FLOAT_ARRAY_MIN_SIZE
+                and type(obj[0]) is float
+                and all(type(item) is float for item in obj)
+            ):
+                _pack_float_items(obj, buffer)
+            elif (
+                length >= _FIXINT_ARRAY_MIN_SIZE
+                and type(obj[0]) is int
+                and (packed := _pack_fixint_items(obj)) is not None
+            ):
+                buffer += packed
+            elif length:
+                stack.append((iter(obj), False))
+                if len(stack) > _CYCLE_CHECK_DEPTH:
+                    deep_containers = _enter_container(obj, deep_containers)
+
+        elif cls is float:
+            buffer += _STRUCT_MARKER_FLOAT64.pack(_FLOAT64, obj)
+
+        else:
+            packer = _PACK_BY_TYPE.get(cls)
+            if packer is not None:
+                packer(obj, buffer)
+            else:
+                _pack_object(obj, buffer)
+
+        # Advance to the next pending item, closing exhausted containers
+        while stack:
+            items, is_map = stack[-1]
+            for obj in items:
+                break
+            else:
+                if len(stack) > _CYCLE_CHECK_DEPTH:
+                    deep_containers.popitem()
+                stack.pop()
+                continue
+            if is_map:
+                key, obj = obj
+                if type(key) is str:
+                    packed_key = _FIXSTR_CACHE.get(key)
+                    if packed_key is None:
+                        packed_key = _pack_key(key)
+                    buffer += packed_key
+                else:
+                    _pack_value(key, buffer)
+            break
+        else:
+            return
+
+
+def _enter_container(obj: Any, open_containers: dict | None) -> dict:
+    """
+    Track a list or dict opened deep inside _pack_value.
+
+    A container that is already open is its own ancestor, so packing it
+    would never finish. Insertion order matches the stack, so closing a
+    container is open_containers.popitem().
+    """
+    if open_containers is None:
+        open_containers = {}
+    elif id(obj) in open_containers:
+        raise ValueError("Circular reference detected")
+    open_containers[id(obj)] = obj
+    return open_containers
+
+
+def _pack_object(obj: Any, buffer: bytearray) -> None:
+    """Pack a value whose exact type is not in _PACK_BY_TYPE (subclasses etc.)."""
     _extend = buffer.extend
-    _append = buffer.append
 
     if obj is None:
         _extend(_BYTES_NONE)
@@ -141,6 +325,10 @@ def _pack_value(obj: Any, buffer: bytearray) -> None:
     elif obj is False:
         _extend(_BYTES_FALSE)
 
+    elif (packer := _SPECIALIZED_PACKERS.get(type(obj))) is not None:
+        # Dataclasses, NamedTuples and registered types seen before
+        packer(obj, buffer)
+
     elif isinstance(obj, Enum):
         _pack_enum(obj, buffer)
 
@@ -190,6 +378,9 @@ def _pack_value(obj: Any, buffer: bytearray) -> None:
     elif isinstance(obj, set):
         _pack_set(obj, buffer)
 
+    elif isinstance(obj, _types.QuantizedFloats):
+        _pack_quantized(obj, buffer)
+
     elif isinstance(obj, list):
         _pack_list(obj, buffer)
 
@@ -203,65 +394,118 @@ def _pack_value(obj: Any, buffer: bytearray) -> None:
         raise TypeError(f"Unsupported type: {type(obj).__name__}")
 
 
+def _pack_none(value: None, buffer: bytearray) -> None:
+    """Pack None."""
+    buffer += _BYTES_NONE
+
+
+def _pack_bool(value: bool, buffer: bytearray) -> None:
+    """Pack a bool value."""
+    buffer += _BYTES_TRUE if value else _BYTES_FALSE
+
+
 def _pack_int(value: int, buffer: bytearray) -> None:
     """Pack an integer value."""
-    if 0 <= value <= 127:
-        # Positive fixint
-        buffer.append(value)
-    elif -32 <= value < 0:
-        # Negative fixint
-        buffer.append(value & 0xFF)
-    elif 0 <= value <= 0xFF:
-        buffer.append(_UINT8)
-        buffer.append(value)
-    elif 0 <= value <= 0xFFFF:
-        buffer.append(_UINT16)
-        buffer.extend(_STRUCT_UINT16.pack(value))
-    elif 0 <= value <= 0xFFFFFFFF:
-        buffer.append(_UINT32)
-        buffer.extend(_STRUCT_UINT32.pack(value))
-    elif 0 <= value <= 0xFFFFFFFFFFFFFFFF:
-        buffer.append(_UINT64)
-        buffer.extend(_STRUCT_UINT64.pack(value))
-    elif -128 <= value < 0:
-        buffer.append(_INT8)
-        buffer.extend(_STRUCT_INT8.pack(value))
-    elif -32768 <= value < 0:
-        buffer.append(_INT16)
-        buffer.extend(_STRUCT_INT16.pack(value))
-    elif -2147483648 <= value < 0:
-        buffer.append(_INT32)
-        buffer.extend(_STRUCT_INT32.pack(value))
+    if value >= 0:
+        if value <= 127:
+            # Positive fixint
+            buffer.append(value)
+            return
+        bits = value.bit_length()
+        table = _UINT_PACKERS
     else:
-        buffer.append(_INT64)
-        buffer.extend(_STRUCT_INT64.pack(value))
+        if value >= -32:
+            # Negative fixint
+            buffer.append(value & 0xFF)
+            return
+        # Bits needed for the magnitude, excluding the sign bit
+        bits = (~value).bit_length()
+        table = _INT_PACKERS
+
+    if bits >= len(table):
+        raise OverflowError("Integer too large to pack")
+    marker, packer = table[bits]
+    buffer += packer(marker, value)
 
 
 def _pack_float(value: float, buffer: bytearray) -> None:
     """Pack a float value (always as float64 for precision)."""
-    buffer.append(_FLOAT64)
-    buffer.extend(_STRUCT_FLOAT64.pack(value))
+    buffer += _STRUCT_MARKER_FLOAT64.pack(_FLOAT64, value)
+
+
+def _pack_key(key: str) -> bytes:
+    """Pack a str dict key, caching the result if it is a fixstr."""
+    encoded = key.encode("utf-8")
+    length = len(encoded)
+    if length <= 31:
+        packed_key = bytes([0xA0 | length]) + encoded
+        if len(_FIXSTR_CACHE) < _FIXSTR_CACHE_SIZE:
+            _FIXSTR_CACHE[key] = packed_key
+        return packed_key
+
+    buffer = bytearray()
+    _pack_str_header(length, buffer)
+    buffer += encoded
+    return bytes(buffer)
+
+
+def _pack_float_items(values: list, buffer: bytearray) -> None:
+    """
+    Pack the items of a list made only of floats.
+
+    Converts the whole list to big-endian doubles with array("d") and
+    interleaves the float64 markers using strided slice assignment, so the
+    per-item work happens in C instead of once per item in Python.
+    """
+    doubles = array("d", values)
+    if _LITTLE_ENDIAN:
+        doubles.byteswap()
+    raw = doubles.tobytes()
+
+    count = len(values)
+    items = bytearray(9 * count)
+    items[0::9] = _BYTES_FLOAT64 * count
+    for i in range(8):
+        items[1 + i::9] = raw[i::8]
+    buffer += items
+
+
+def _pack_fixint_items(values: list) -> bytes | None:
+    """
+    Pack the items of a list made only of ints in 0-127, or return None.
+
+    A positive fixint is the value byte itself, so such a list packs to
+    bytes(values). Building it in C fails fast on other ints and types;
+    isascii() then rejects 128-255, and bools, which bytes() accepts, are
+    ruled out by the exact type check.
+    """
+    try:
+        packed = bytes(values)
+    except (TypeError, ValueError):
+        return None
+    if packed.isascii() and {*map(type, values)} == {int}:
+        return packed
+    return None
 
 
 def _pack_str(value: str, buffer: bytearray) -> None:
     """Pack a string value."""
     encoded = value.encode("utf-8")
-    length = len(encoded)
+    _pack_str_header(len(encoded), buffer)
+    buffer += encoded
+
 
+def _pack_str_header(length: int, buffer: bytearray) -> None:
+    """Pack the header of a string with the given UTF-8 length."""
     if length <= 31:
         # Fixstr
         buffer.append(0xA0 | length)
     elif length <= 0xFF:
-        buffer.append(_STR8)
-        buffer.append(length)
+        buffer += _STRUCT_MARKER_UINT8.pack(_STR8, length)
     elif length <= 0xFFFF:
-        buffer.append(_STR16)
-        buffer.extend(_STRUCT_UINT16.pack(length))
+        buffer += _STRUCT_MARKER_UINT16.pack(_STR16, length)
     else:
-        buffer.append(_STR32)
-        buffer.extend(_STRUCT_UINT32.pack(length))
-
-    buffer.extend(encoded)
+        buffer += _STRUCT_MARKER_UINT32.pack(_STR32, length)
 
 
 def _pack_bytes(value: bytes, buffer: bytearray) -> None:
@@ -269,53 +513,50 @@ def _pack_bytes(value: bytes, buffer: bytearray) -> None:
     length = len(value)
 
     if length <= 0xFF:
-        buffer.append(_BIN8)
-        buffer.append(length)
+        buffer += _STRUCT_MARKER_UINT8.pack(_BIN8, length)
     elif length <= 0xFFFF:
-        buffer.append(_BIN16)
-        buffer.extend(_STRUCT_UINT16.pack(length))
+        buffer += _STRUCT_MARKER_UINT16.pack(_BIN16, length)
     else:
-        buffer.append(_BIN32)
-        buffer.extend(_STRUCT_UINT32.pack(length))
+        buffer += _STRUCT_MARKER_UINT32.pack(_BIN32, length)
 
-    buffer.extend(value)
+    buffer += value
 
 
 def _pack_list(value: list, buffer: bytearray) -> None:
     """Pack a list value."""
-    length = len(value)
+    _pack_array_header(len(value), buffer)
+    for item in value:
+        _pack_value(item, buffer)
 
+
+def _pack_array_header(length: int, buffer: bytearray) -> None:
+    """Pack the header of an array with the given number of items."""
     if length <= 15:
         # Fixarray
         buffer.append(0x90 | length)
     elif length <= 0xFFFF:
-        buffer.append(_ARRAY16)
-        buffer.extend(_STRUCT_UINT16.pack(length))
+        buffer += _STRUCT_MARKER_UINT16.pack(_ARRAY16, length)
     else:
-        buffer.append(_ARRAY32)
-        buffer.extend(_STRUCT_UINT32.pack(length))
-
-    for item in value:
-        _pack_value(item, buffer)
+        buffer += _STRUCT_MARKER_UINT32.pack(_ARRAY32, length)
 
 
 def _pack_dict(value: dict, buffer: bytearray) -> None:
     """Pack a dict value."""
-    length = len(value)
+    _pack_map_header(len(value), buffer)
+    for k, v in value.items():
+        _pack_value(k, buffer)
+        _pack_value(v, buffer)
 
+
+def _pack_map_header(length: int, buffer: bytearray) -> None:
+    """Pack the header of a map with the given number of pairs."""
     if length <= 15:
         # Fixmap
         buffer.append(0x80 | length)
     elif length <= 0xFFFF:
-        buffer.append(_MAP16)
-        buffer.extend(_STRUCT_UINT16.pack(length))
+        buffer += _STRUCT_MARKER_UINT16.pack(_MAP16, length)
     else:
-        buffer.append(_MAP32)
-        buffer.extend(_STRUCT_UINT32.pack(length))
-
-    for k, v in value.items():
-        _pack_value(k, buffer)
-        _pack_value(v, buffer)
+        buffer += _STRUCT_MARKER_UINT32.pack(_MAP32, length)
 
 
 def _pack_ext(type_code: int, data: bytes, buffer: bytearray) -> None:
@@ -323,34 +564,23 @@ def _pack_ext(type_code: int, data: bytes, buffer: bytearray) -> None:
     length = len(data)
 
     if length == 1:
-        buffer.append(_FIXEXT1)
-        buffer.append(type_code)
+        buffer += _STRUCT_MARKER_UINT8.pack(_FIXEXT1, type_code)
     elif length == 2:
-        buffer.append(_FIXEXT2)
-        buffer.append(type_code)
+        buffer += _STRUCT_MARKER_UINT8.pack(_FIXEXT2, type_code)
     elif length == 4:
-        buffer.append(_FIXEXT4)
-        buffer.append(type_code)
+        buffer += _STRUCT_MARKER_UINT8.pack(_FIXEXT4, type_code)
     elif length == 8:
-        buffer.append(_FIXEXT8)
-        buffer.append(type_code)
+        buffer += _STRUCT_MARKER_UINT8.pack(_FIXEXT8, type_code)
     elif length == 16:
-        buffer.append(_FIXEXT16)
-        buffer.append(type_code)
+        buffer += _STRUCT_MARKER_UINT8.pack(_FIXEXT16, type_code)
     elif length <= 0xFF:
-        buffer.append(_EXT8)
-        buffer.append(length)
-        buffer.append(type_code)
+        buffer += _STRUCT_EXT8_HEADER.pack(_EXT8, length, type_code)
     elif length <= 0xFFFF:
-        buffer.append(_EXT16)
-        buffer.extend(_STRUCT_UINT16.pack(length))
-        buffer.append(type_code)
+        buffer += _STRUCT_EXT16_HEADER.pack(_EXT16, length, type_code)
     else:
-        buffer.append(_EXT32)
-        buffer.extend(_STRUCT_UINT32.pack(length))
-        buffer.append(type_code)
+        buffer += _STRUCT_EXT32_HEADER.pack(_EXT32, length, type_code)
 
-    buffer.extend(data)
+    buffer += data
 
 
 def _pack_datetime(value: datetime, buffer: bytearray) -> None:
@@ -391,21 +621,21 @@ def _pack_uuid(value: UUID, buffer: bytearray) -> None:
 def _pack_set(value: set, buffer: bytearray) -> None:
     """Pack a set value as an array."""
     items_buffer = bytearray()
-    _pack_list(list(value), items_buffer)
+    _pack_value(list(value), items_buffer)
     _pack_ext(_EXT_SET, bytes(items_buffer), buffer)
 
 
 def _pack_tuple(value: tuple, buffer: bytearray) -> None:
     """Pack a tuple value as an array."""
     items_buffer = bytearray()
-    _pack_list(list(value), items_buffer)
+    _pack_value(list(value), items_buffer)
     _pack_ext(_EXT_TUPLE, bytes(items_buffer), buffer)
 
 
 def _pack_frozenset(value: frozenset, buffer: bytearray) -> None:
     """Pack a frozenset value as an array."""
     items_buffer = bytearray()
-    _pack_list(list(value), items_buffer)
+    _pack_value(list(value), items_buffer)
     _pack_ext(_EXT_FROZENSET, bytes(items_buffer), buffer)
 
 
@@ -418,7 +648,7 @@ def _pack_enum(value: Enum, buffer: bytearray) -> None:
         "value": value.value,
     }
     items_buffer = bytearray()
-    _pack_dict(enum_data, items_buffer)
+    _pack_value(enum_data, items_buffer)
     _pack_ext(_EXT_ENUM, bytes(items_buffer), buffer)
 
 
@@ -433,18 +663,37 @@ def _is_namedtuple(obj: Any) -> bool:
 
 def _pack_namedtuple(value: Any, buffer: bytearray) -> None:
     """Pack a NamedTuple as {__namedtuple__: class_name, **fields}."""
+    cls = type(value)
+    header = {"__namedtuple__": cls.__name__, "__module__": cls.__module__}
+    packer = _compile_packer(cls, _EXT_NAMEDTUPLE, header, None, cls._fields)
+    _SPECIALIZED_PACKERS[cls] = packer or _pack_namedtuple_dict
+    _SPECIALIZED_PACKERS[cls](value, buffer)
+
+
+def _pack_namedtuple_dict(value: Any, buffer: bytearray) -> None:
+    """Pack a NamedTuple by building its dict form."""
     data = {
         "__namedtuple__": type(value).__name__,
         "__module__": type(value).__module__,
         **value._asdict(),
     }
     items_buffer = bytearray()
-    _pack_dict(data, items_buffer)
+    _pack_value(data, items_buffer)
     _pack_ext(_EXT_NAMEDTUPLE, bytes(items_buffer), buffer)
 
 
 def _pack_dataclass(value: Any, buffer: bytearray) -> None:
     """Pack a dataclass as {__dataclass__: class_name, **fields}."""
+    cls = type(value)
+    header = {"__dataclass__": cls.__name__, "__module__": cls.__module__}
+    field_names = [field.name for field in fields(cls)]
+    packer = _compile_packer(cls, _EXT_DATACLASS, header, None, field_names)
+    _SPECIALIZED_PACKERS[cls] = packer or _pack_dataclass_dict
+    _SPECIALIZED_PACKERS[cls](value, buffer)
+
+
+def _pack_dataclass_dict(value: Any, buffer: bytearray) -> None:
+    """Pack a dataclass by building its dict form."""
     data = {
         "__dataclass__": type(value).__name__,
         "__module__": type(value).__module__,
@@ -453,12 +702,114 @@ def _pack_dataclass(value: Any, buffer: bytearray) -> None:
         data[field.name] = getattr(value, field.name)
 
     items_buffer = bytearray()
-    _pack_dict(data, items_buffer)
+    _pack_value(data, items_buffer)
     _pack_ext(_EXT_DATACLASS, bytes(items_buffer), buffer)
 
 
+def _compile_packer(
+    cls: Type,
+    ext_type: int,
+    header: dict,
+    data_key: str | None,
+    field_names: list[str],
+) -> Callable[[Any, bytearray], None] | None:
+    """
+    Generate a pack function specialized for instances of cls.
+
+    The output matches packing the dict {**header, **fields} (or
+    {**header, data_key: fields} when data_key is given) as extension
+    ext_type, but the map headers, header entries and field keys are
+    precomputed bytes literals, leaving one _pack_value call per field.
+
+    Returns None if the fields cannot be specialized, e.g. a field name
+    that is not an identifier or that collides with a header key.
+    """
+    for name in field_names:
+        if not name.isidentifier() or keyword.iskeyword(name):
+            return None
+        if data_key is None and name in header:
+            return None
+
+    prefix = bytearray()
+    if data_key is None:
+        _pack_map_header(len(header) + len(field_names), prefix)
+    else:
+        _pack_map_header(len(header) + 1, prefix)
+    for key, value in header.items():
+        _pack_value(key, prefix)
+        _pack_value(value, prefix)
+    if data_key is not None:
+        _pack_value(data_key, prefix)
+        _pack_map_header(len(field_names), prefix)
+
+    lines = ["def packer(obj, buffer):", f"    items = bytearray({bytes(prefix)!r})"]
+    for name in field_names:
+        key = bytearray()
+        _pack_value(name, key)
+        lines.append(f"    items += {bytes(key)!r}")
+        lines.append(f"    _pack_value(obj.{name}, items)")
+    lines.append(f"    _pack_ext({ext_type}, items, buffer)")
+
+    namespace = {"_pack_value": _pack_value, "_pack_ext": _pack_ext}
+    exec("\n".join(lines), namespace)
+    packer = namespace["packer"]
+    packer.__name__ = packer.__qualname__ = f"_pack_{cls.__name__}"
+    return packer
+
+
+def _pack_quantized(value: list, buffer: bytearray) -> None:
+    """Pack a QuantizedFloats list as a float32 scale and int8 samples."""
+    if not all(map(math.isfinite, value)):
+        raise ValueError("QuantizedFloats values must be finite")
+    amax = max(map(abs, value), default=0.0)
+    if amax and not _QUANTIZED_MIN_ABS <= amax <= _QUANTIZED_MAX_ABS:
+        raise ValueError(
+            f"QuantizedFloats max(abs) must be 0 or between "
+            f"{_QUANTIZED_MIN_ABS:.4g} and {_QUANTIZED_MAX_ABS:.4g}, got {amax:.4g}"
+        )
+
+    # Round the scale to float32 up front so both sides use the same value
+    scale = _STRUCT_FLOAT32.unpack(_STRUCT_FLOAT32.pack(amax / 127))[0]
+    if scale:
+        samples = array("b", [round(item / scale) for item in value])
+    else:
+        samples = array("b", bytes(len(value)))
+
+    data = _STRUCT_FLOAT32.pack(scale) + samples.tobytes()
+    _pack_ext(_EXT_QUANTIZED, data, buffer)
+
+
 def _pack_registered(value: Any, buffer: bytearray) -> None:
     """Pack a registered custom type."""
+    cls = type(value)
+    encoder_info = _types.get_encoder(cls)
+    if encoder_info is None:
+        raise TypeError(f"Type {cls.__name__} is not registered")
+
+    # Types using the default dataclass/NamedTuple encoders get a
+    # specialized packer; custom __typepack_encode__ output is arbitrary.
+    type_code, encode_fn = encoder_info
+    if encode_fn is _types._dataclass_encode:
+        field_names = [field.name for field in fields(cls)]
+    elif encode_fn is _types._namedtuple_encode:
+        field_names = cls._fields
+    else:
+        field_names = None
+
+    packer = None
+    if field_names is not None:
+        header = {
+            "__custom__": cls.__name__,
+            "__module__": cls.__module__,
+            "__type_code__": type_code,
+        }
+        packer = _compile_packer(cls, _EXT_CUSTOM, header, "data", field_names)
+    _SPECIALIZED_PACKERS[cls] = packer or _pack_registered_dict
+    _SPECIALIZED_PACKERS[cls](value, buffer)
+
+
+def _pack_registered_dict(value: Any, buffer: bytearray) -> None:
+    """Pack a registered custom type by building its dict form."""
     encoder_info = _types.get_encoder(type(value))
     if encoder_info is None:
         raise TypeError(f"Type {type(value).__name__} is not registered")
@@ -474,236 +825,323 @@ def _pack_registered(value: Any, buffer: bytearray) -> None:
         "data": encoded_data,
     }
     items_buffer = bytearray()
-    _pack_dict(data, items_buffer)
+    _pack_value(data, items_buffer)
     _pack_ext(_EXT_CUSTOM, bytes(items_buffer), buffer)
 
 
+# Packers for exact built-in types that _pack_value does not inline. Looking
+# up type(obj) here skips the isinstance chain in _pack_object, which is only
+# needed for subclasses, registered types and dataclasses. None of these
+# types can be registered, since they lack __typepack_encode__.
+_PACK_BY_TYPE: dict[type, Callable[[Any, bytearray], None]] = {
+    type(None): _pack_none,
+    bool: _pack_bool,
+    bytes: _pack_bytes,
+    datetime: _pack_datetime,
+    date: _pack_date,
+    time: _pack_time,
+    timedelta: _pack_timedelta,
+    Decimal: _pack_decimal,
+    UUID: _pack_uuid,
+    tuple: _pack_tuple,
+    set: _pack_set,
+    frozenset: _pack_frozenset,
+}
+
+
 def _unpack_value(data: bytes, offset: int) -> tuple[Any, int]:
-    """Unpack a single value from the data at the given offset."""
-    if offset >= len(data):
-        raise ValueError("Unexpected end of data")
+    """
+    Unpack a single value from the data at the given offset.
+
+    Arrays and maps are filled through an explicit stack of partially built
+    containers rather than by recursion, so nested data costs no extra
+    Python frames per element.
+    """
+    # The innermost open container is kept in locals; enclosing ones are
+    # saved on the stack as (container, append, remaining, key) tuples.
+    # append is the bound list.append for arrays and None for maps. Calling
+    # it measured faster than preallocating [None] * length and storing by
+    # index, which also needs an index kept per open array.
+    stack = []
+    container = None
+    append = None
+    remaining = 0
+    key = _NO_KEY
+    end = len(data)
+
+    while True:
+        if offset >= end:
+            raise ValueError("Unexpected end of data")
+
+        marker = data[offset]
+        offset += 1
 
-    marker = data[offset]
+        if marker <= 0x7F:
+            # Positive fixint
+            value = marker
+
+        elif 0xA0 <= marker <= 0xBF:
+            # Fixstr
+            length = marker & 0x1F
+            raw = data[offset:offset + length]
+            offset += length
+            if append is None and key is _NO_KEY:
+                # A map key (or a lone top-level string)
+                if type(raw) is not bytes:
+                    # Slices of bytearray input are unhashable
+                    raw = bytes(raw)
+                value = _KEY_CACHE.get(raw)
+                if value is None:
+                    value = raw.decode()
+                    # Only cached keys are interned, so both stay bounded
+                    # (interned strings are immortal on CPython 3.12+)
+                    if len(_KEY_CACHE) < _KEY_CACHE_SIZE:
+                        value = sys.intern(value)
+                        _KEY_CACHE[raw] = value
+            else:
+                # decode() defaults to strict UTF-8 and skips the codec name lookup
+                value = raw.decode()
+
+        elif marker <= 0x9F or _ARRAY16 <= marker <= _MAP32:
+            # Fixmap, fixarray, array16/32 and map16/32
+            if marker <= 0x8F:
+                length = marker & 0x0F
+                is_map = True
+            elif marker <= 0x9F:
+                length = marker & 0x0F
+                is_map = False
+            elif marker == _ARRAY16 or marker == _MAP16:
+                length = _STRUCT_UINT16.unpack_from(data, offset)[0]
+                offset += 2
+                is_map = marker == _MAP16
+            else:
+                length = _STRUCT_UINT32.unpack_from(data, offset)[0]
+                offset += 4
+                is_map = marker == _MAP32
+
+            value = {} if is_map else []
+            if length:
+                stack.append((container, append, remaining, key))
+                container = value
+                append = None if is_map else value.append
+                remaining = length
+                key = _NO_KEY
+                continue
+
+        else:
+            value, offset = _UNPACK_DISPATCH[marker](data, offset, marker)
+
+        # Store the value in its container, closing containers that are full
+        while container is not None:
+            if append is not None:
+                append(value)
+            elif key is _NO_KEY:
+                key = value
+                break
+            else:
+                container[key] = value
+                key = _NO_KEY
+            remaining -= 1
+            if remaining:
+                break
+            value = container
+            container, append, remaining, key = stack.pop()
+        else:
+            return value, offset
+
+
+def _unpack_nil(data: bytes, offset: int, marker: int) -> tuple[None, int]:
+    """Unpack None."""
+    return None, offset
+
+
+def _unpack_false(data: bytes, offset: int, marker: int) -> tuple[bool, int]:
+    """Unpack False."""
+    return False, offset
+
+
+def _unpack_true(data: bytes, offset: int, marker: int) -> tuple[bool, int]:
+    """Unpack True."""
+    return True, offset
+
+
+def _unpack_negative_fixint(data: bytes, offset: int, marker: int) -> tuple[int, int]:
+    """Unpack a negative fixint (0xE0 - 0xFF)."""
+    return marker - 0x100, offset
+
+
+def _unpack_fixed_width(fmt: struct.Struct) -> Callable[[bytes, int, int], tuple[Any, int]]:
+    """Build a handler for a marker followed by a fixed-width number."""
+    unpack_from = fmt.unpack_from
+    size = fmt.size
+
+    def handler(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+        return unpack_from(data, offset)[0], offset + size
+
+    return handler
+
+
+def _unpack_uint8(data: bytes, offset: int, marker: int) -> tuple[int, int]:
+    """Unpack a uint8."""
+    return data[offset], offset + 1
+
+
+def _unpack_bin8(data: bytes, offset: int, marker: int) -> tuple[bytes, int]:
+    """Unpack a bin8 value."""
+    length = data[offset]
     offset += 1
+    return data[offset:offset + length], offset + length
+
+
+def _unpack_bin16(data: bytes, offset: int, marker: int) -> tuple[bytes, int]:
+    """Unpack a bin16 value."""
+    length = _STRUCT_UINT16.unpack_from(data, offset)[0]
+    offset += 2
+    return data[offset:offset + length], offset + length
+
+
+def _unpack_bin32(data: bytes, offset: int, marker: int) -> tuple[bytes, int]:
+    """Unpack a bin32 value."""
+    length = _STRUCT_UINT32.unpack_from(data, offset)[0]
+    offset += 4
+    return data[offset:offset + length], offset + length
+
+
+def _unpack_str8(data: bytes, offset: int, marker: int) -> tuple[str, int]:
+    """Unpack a str8 value."""
+    return _unpack_str(data, offset + 1, data[offset])
+
+
+def _unpack_str16(data: bytes, offset: int, marker: int) -> tuple[str, int]:
+    """Unpack a str16 value."""
+    length = _STRUCT_UINT16.unpack_from(data, offset)[0]
+    return _unpack_str(data, offset + 2, length)
+
+
+def _unpack_str32(data: bytes, offset: int, marker: int) -> tuple[str, int]:
+    """Unpack a str32 value."""
+    length = _STRUCT_UINT32.unpack_from(data, offset)[0]
+    return _unpack_str(data, offset + 4, length)
+
+
+def _unpack_fixext(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+    """Unpack a fixext1/2/4/8/16 value."""
+    length = 1 << (marker - _FIXEXT1)
+    type_code = data[offset]
+    offset += 1
+    return _unpack_ext(type_code, data, offset, length), offset + length
+
+
+def _unpack_ext8(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+    """Unpack an ext8 value."""
+    length = data[offset]
+    type_code = data[offset + 1]
+    offset += 2
+    return _unpack_ext(type_code, data, offset, length), offset + length
 
-    # Positive fixint (0x00 - 0x7F)
-    if marker <= 0x7F:
-        return marker, offset
-
-    # Fixmap (0x80 - 0x8F)
-    if 0x80 <= marker <= 0x8F:
-        length = marker & 0x0F
-        return _unpack_map(data, offset, length)
-
-    # Fixarray (0x90 - 0x9F)
-    if 0x90 <= marker <= 0x9F:
-        length = marker & 0x0F
-        return _unpack_array(data, offset, length)
-
-    # Fixstr (0xA0 - 0xBF)
-    if 0xA0 <= marker <= 0xBF:
-        length = marker & 0x1F
-        return _unpack_str(data, offset, length)
-
-    # Negative fixint (0xE0 - 0xFF)
-    if marker >= 0xE0:
-        return _STRUCT_INT8.unpack(bytes([marker]))[0], offset
-
-    # None
-    if marker == _NONE:
-        return None, offset
-
-    # Boolean
-    if marker == _FALSE:
-        return False, offset
-    if marker == _TRUE:
-        return True, offset
-
-    # Binary
-    if marker == _BIN8:
-        length = data[offset]
-        offset += 1
-        return data[offset:offset + length], offset + length
-    if marker == _BIN16:
-        length = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        offset += 2
-        return data[offset:offset + length], offset + length
-    if marker == _BIN32:
-        length = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        offset += 4
-        return data[offset:offset + length], offset + length
-
-    # Float
-    if marker == _FLOAT32:
-        value = _STRUCT_FLOAT32.unpack_from(data, offset)[0]
-        return value, offset + 4
-    if marker == _FLOAT64:
-        value = _STRUCT_FLOAT64.unpack_from(data, offset)[0]
-        return value, offset + 8
-
-    # Unsigned integers
-    if marker == _UINT8:
-        return data[offset], offset + 1
-    if marker == _UINT16:
-        value = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        return value, offset + 2
-    if marker == _UINT32:
-        value = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        return value, offset + 4
-    if marker == _UINT64:
-        value = _STRUCT_UINT64.unpack_from(data, offset)[0]
-        return value, offset + 8
-
-    # Signed integers
-    if marker == _INT8:
-        value = _STRUCT_INT8.unpack_from(data, offset)[0]
-        return value, offset + 1
-    if marker == _INT16:
-        value = _STRUCT_INT16.unpack_from(data, offset)[0]
-        return value, offset + 2
-    if marker == _INT32:
-        value = _STRUCT_INT32.unpack_from(data, offset)[0]
-        return value, offset + 4
-    if marker == _INT64:
-        value = _STRUCT_INT64.unpack_from(data, offset)[0]
-        return value, offset + 8
-
-    # Strings
-    if marker == _STR8:
-        length = data[offset]
-        offset += 1
-        return _unpack_str(data, offset, length)
-    if marker == _STR16:
-        length = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        offset += 2
-        return _unpack_str(data, offset, length)
-    if marker == _STR32:
-        length = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        offset += 4
-        return _unpack_str(data, offset, length)
-
-    # Arrays
-    if marker == _ARRAY16:
-        length = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        offset += 2
-        return _unpack_array(data, offset, length)
-    if marker == _ARRAY32:
-        length = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        offset += 4
-        return _unpack_array(data, offset, length)
-
-    # Maps
-    if marker == _MAP16:
-        length = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        offset += 2
-        return _unpack_map(data, offset, length)
-    if marker == _MAP32:
-        length = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        offset += 4
-        return _unpack_map(data, offset, length)
-
-    # Extension types (fixext)
-    if marker == _FIXEXT1:
-        type_code = data[offset]
-        offset += 1
-        return _unpack_ext(type_code, data[offset:offset + 1]), offset + 1
-    if marker == _FIXEXT2:
-        type_code = data[offset]
-        offset += 1
-        return _unpack_ext(type_code, data[offset:offset + 2]), offset + 2
-    if marker == _FIXEXT4:
-        type_code = data[offset]
-        offset += 1
-        return _unpack_ext(type_code, data[offset:offset + 4]), offset + 4
-    if marker == _FIXEXT8:
-        type_code = data[offset]
-        offset += 1
-        return _unpack_ext(type_code, data[offset:offset + 8]), offset + 8
-    if marker == _FIXEXT16:
-        type_code = data[offset]
-        offset += 1
-        return _unpack_ext(type_code, data[offset:offset + 16]), offset + 16
-
-    # Extension types (ext8/16/32)
-    if marker == _EXT8:
-        length = data[offset]
-        type_code = data[offset + 1]
-        offset += 2
-        return _unpack_ext(type_code, data[offset:offset + length]), offset + length
-    if marker == _EXT16:
-        length = _STRUCT_UINT16.unpack_from(data, offset)[0]
-        type_code = data[offset + 2]
-        offset += 3
-        return _unpack_ext(type_code, data[offset:offset + length]), offset + length
-    if marker == _EXT32:
-        length = _STRUCT_UINT32.unpack_from(data, offset)[0]
-        type_code = data[offset + 4]
-        offset += 5
-        return _unpack_ext(type_code, data[offset:offset + length]), offset + length
 
+def _unpack_ext16(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+    """Unpack an ext16 value."""
+    length = _STRUCT_UINT16.unpack_from(data, offset)[0]
+    type_code = data[offset + 2]
+    offset += 3
+    return _unpack_ext(type_code, data, offset, length), offset + length
+
+
+def _unpack_ext32(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+    """Unpack an ext32 value."""
+    length = _STRUCT_UINT32.unpack_from(data, offset)[0]
+    type_code = data[offset + 4]
+    offset += 5
+    return _unpack_ext(type_code, data, offset, length), offset + length
+
+
+def _unpack_unknown(data: bytes, offset: int, marker: int) -> tuple[Any, int]:
+    """Reject a marker that has no handler."""
     raise ValueError(f"Unknown format marker: 0x{marker:02X}")
 
 
+# Handlers for non-container markers, indexed by marker byte. Each takes
+# (data, offset just past the marker, marker) and returns (value, new offset).
+# Fixints, fixstrs and container markers are handled inline by _unpack_value.
+_UNPACK_DISPATCH = [_unpack_unknown] * 256
+_UNPACK_DISPATCH[0xE0:0x100] = [_unpack_negative_fixint] * 0x20
+_UNPACK_DISPATCH[_NONE] = _unpack_nil
+_UNPACK_DISPATCH[_FALSE] = _unpack_false
+_UNPACK_DISPATCH[_TRUE] = _unpack_true
+_UNPACK_DISPATCH[_BIN8] = _unpack_bin8
+_UNPACK_DISPATCH[_BIN16] = _unpack_bin16
+_UNPACK_DISPATCH[_BIN32] = _unpack_bin32
+_UNPACK_DISPATCH[_FLOAT32] = _unpack_fixed_width(_STRUCT_FLOAT32)
+_UNPACK_DISPATCH[_FLOAT64] = _unpack_fixed_width(_STRUCT_FLOAT64)
+_UNPACK_DISPATCH[_UINT8] = _unpack_uint8
+_UNPACK_DISPATCH[_UINT16] = _unpack_fixed_width(_STRUCT_UINT16)
+_UNPACK_DISPATCH[_UINT32] = _unpack_fixed_width(_STRUCT_UINT32)
+_UNPACK_DISPATCH[_UINT64] = _unpack_fixed_width(_STRUCT_UINT64)
+_UNPACK_DISPATCH[_INT8] = _unpack_fixed_width(_STRUCT_INT8)
+_UNPACK_DISPATCH[_INT16] = _unpack_fixed_width(_STRUCT_INT16)
+_UNPACK_DISPATCH[_INT32] = _unpack_fixed_width(_STRUCT_INT32)
+_UNPACK_DISPATCH[_INT64] = _unpack_fixed_width(_STRUCT_INT64)
+_UNPACK_DISPATCH[_STR8] = _unpack_str8
+_UNPACK_DISPATCH[_STR16] = _unpack_str16
+_UNPACK_DISPATCH[_STR32] = _unpack_str32
+_UNPACK_DISPATCH[_FIXEXT1:_FIXEXT16 + 1] = [_unpack_fixext] * 5
+_UNPACK_DISPATCH[_EXT8] = _unpack_ext8
+_UNPACK_DISPATCH[_EXT16] = _unpack_ext16
+_UNPACK_DISPATCH[_EXT32] = _unpack_ext32
+
+
 def _unpack_str(data: bytes, offset: int, length: int) -> tuple[str, int]:
     """Unpack a string value."""
-    value = data[offset:offset + length].decode("utf-8")
+    if length >= _ZERO_COPY_MIN_SIZE:
+        # Decode straight from the input instead of copying a slice first
+        value = str(memoryview(data)[offset:offset + length], "utf-8")
+    else:
+        value = data[offset:offset + length].decode()
     return value, offset + length
 
 
-def _unpack_array(data: bytes, offset: int, length: int) -> tuple[list, int]:
-    """Unpack an array value."""
-    result = []
-    for _ in range(length):
-        item, offset = _unpack_value(data, offset)
-        result.append(item)
-    return result, offset
-
-
-def _unpack_map(data: bytes, offset: int, length: int) -> tuple[dict, int]:
-    """Unpack a map value."""
-    result = {}
-    for _ in range(length):
-        key, offset = _unpack_value(data, offset)
-        value, offset = _unpack_value(data, offset)
-        result[key] = value
-    return result, offset
-
+def _unpack_ext(type_code: int, data: bytes, offset: int, length: int) -> Any:
+    """
+    Unpack an extension type value.
 
-def _unpack_ext(type_code: int, data: bytes) -> Any:
-    """Unpack an extension type value."""
+    The payload is data[offset:offset + length]. Payloads that hold a packed
+    value (set, tuple, dataclass, ...) are decoded in place instead of from
+    a copied slice.
+    """
     if type_code == _EXT_DATETIME:
-        return datetime.fromisoformat(data.decode("utf-8"))
+        return datetime.fromisoformat(data[offset:offset + length].decode("utf-8"))
 
     if type_code == _EXT_DATE:
-        return date.fromisoformat(data.decode("utf-8"))
+        return date.fromisoformat(data[offset:offset + length].decode("utf-8"))
 
     if type_code == _EXT_TIME:
-        return time.fromisoformat(data.decode("utf-8"))
+        return time.fromisoformat(data[offset:offset + length].decode("utf-8"))
 
     if type_code == _EXT_TIMEDELTA:
-        seconds = _STRUCT_FLOAT64.unpack(data)[0]
+        seconds = _STRUCT_FLOAT64.unpack_from(data, offset)[0]
         return timedelta(seconds=seconds)
 
     if type_code == _EXT_DECIMAL:
-        return Decimal(data.decode("utf-8"))
+        return Decimal(data[offset:offset + length].decode("utf-8"))
 
     if type_code == _EXT_UUID:
-        return UUID(bytes=data)
+        return UUID(bytes=data[offset:offset + length])
 
     if type_code == _EXT_SET:
-        items, _ = _unpack_value(data, 0)
+        items = _unpack_payload(data, offset, length)
         return set(items)
 
     if type_code == _EXT_TUPLE:
-        items, _ = _unpack_value(data, 0)
+        items = _unpack_payload(data, offset, length)
         return tuple(items)
 
     if type_code == _EXT_FROZENSET:
-        items, _ = _unpack_value(data, 0)
+        items = _unpack_payload(data, offset, length)
         return frozenset(items)
 
     if type_code == _EXT_ENUM:
-        enum_data, _ = _unpack_value(data, 0)
+        enum_data = _unpack_payload(data, offset, length)
         # Return as dict with enum info (cannot reconstruct without class)
         return {
             "__enum__": True,
@@ -714,7 +1152,7 @@ def _unpack_ext(type_code: int, data: bytes) -> Any:
         }
 
     if type_code == _EXT_DATACLASS:
-        dc_data, _ = _unpack_value(data, 0)
+        dc_data = _unpack_payload(data, offset, length)
         # Return as dict with dataclass info (cannot reconstruct without class)
         return {
             "__dataclass__": dc_data.pop("__dataclass__"),
@@ -723,7 +1161,7 @@ def _unpack_ext(type_code: int, data: bytes) -> Any:
         }
 
     if type_code == _EXT_NAMEDTUPLE:
-        nt_data, _ = _unpack_value(data, 0)
+        nt_data = _unpack_payload(data, offset, length)
         # Return as dict with namedtuple info (cannot reconstruct without class)
         return {
             "__namedtuple__": nt_data.pop("__namedtuple__"),
@@ -731,8 +1169,13 @@ def _unpack_ext(type_code: int, data: bytes) -> Any:
             **nt_data,
         }
 
+    if type_code == _EXT_QUANTIZED:
+        scale = _STRUCT_FLOAT32.unpack_from(data, offset)[0]
+        samples = array("b", data[offset + 4:offset + length])
+        return [sample * scale for sample in samples]
+
     if type_code == _EXT_CUSTOM:
-        custom_data, _ = _unpack_value(data, 0)
+        custom_data = _unpack_payload(data, offset, length)
         registered_type_code = custom_data["__type_code__"]
 
         # Try to decode using registered decoder
@@ -749,3 +1192,11 @@ def _unpack_ext(type_code: int, data: bytes) -> Any:
         }
 
     raise ValueError(f"Unknown extension type: {type_code}")
+
+
+def _unpack_payload(data: bytes, offset: int, length: int) -> Any:
+    """Unpack the value packed inside an extension payload."""
+    value, end = _unpack_value(data, offset)
+    if end > offset + length:
+        raise ValueError("Unexpected end of data")
+    return value
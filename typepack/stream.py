@@ -11,6 +11,10 @@ from typing import Any, BinaryIO, Iterator, Iterable
 from typepack.core import pack, _unpack_value
 
 
+# Pre-compiled struct format for the 4-byte big-endian length prefix
+_STRUCT_LENGTH = struct.Struct(">I")
+
+
 def pack_to(obj: Any, file: BinaryIO) -> int:
     """
     Serialize an object and write it to a file-like object.
@@ -78,7 +82,7 @@ def pack_stream(objects: Iterable[Any], file: BinaryIO) -> int:
     for obj in objects:
         data = pack(obj)
         # Write length prefix (4 bytes, big-endian)
-        length_prefix = struct.pack(">I", len(data))
+        length_prefix = _STRUCT_LENGTH.pack(len(data))
         file.write(length_prefix)
         file.write(data)
         total_bytes += 4 + len(data)
@@ -112,7 +116,7 @@ def unpack_stream(file: BinaryIO) -> Iterator[Any]:
         if len(length_bytes) < 4:
             raise ValueError("Unexpected end of stream while reading length")
 
-        length = struct.unpack(">I", length_bytes)[0]
+        length = _STRUCT_LENGTH.unpack(length_bytes)[0]
 
         # Read object data
         data = file.read(length)
@@ -146,7 +150,7 @@ def iter_unpack(data: bytes) -> Iterator[Any]:
         if offset + 4 > len(data):
             raise ValueError("Unexpected end of data while reading length")
 
-        length = struct.unpack(">I", data[offset:offset + 4])[0]
+        length = _STRUCT_LENGTH.unpack_from(data, offset)[0]
         offset += 4
 
         if offset + length > len(data):
@@ -178,7 +182,7 @@ def pack_many(objects: Iterable[Any]) -> bytes:
     for obj in objects:
         data = pack(obj)
         # Write length prefix (4 bytes, big-endian)
-        buffer.extend(struct.pack(">I", len(data)))
+        buffer.extend(_STRUCT_LENGTH.pack(len(data)))
         buffer.extend(data)
     return bytes(buffer)
 
@@ -4,6 +4,7 @@ Type registry and extension system for typepack.
 Allows registering custom types with encode/decode functions.
 """
 
+import weakref
 from dataclasses import fields, is_dataclass
 from typing import Any, Callable, NamedTuple, Type, get_type_hints
 
@@ -11,10 +12,34 @@ from typing import Any, Callable, NamedTuple, Type, get_type_hints
 _type_registry: dict[Type, tuple[int, Callable, Callable]] = {}
 _type_code_registry: dict[int, tuple[Type, Callable]] = {}
 
-# Start custom type codes after built-in ones (0x01-0x0A)
+# Pack functions that typepack.core generates per class (see
+# core._compile_packer). They bake in registry state such as type codes,
+# so they are dropped whenever the registry changes. Keyed weakly so that
+# classes created at runtime (namedtuple(), make_dataclass()) can still be
+# garbage-collected after being packed.
+_specialized_packers: weakref.WeakKeyDictionary[Type, Callable] = weakref.WeakKeyDictionary()
+
+# Start custom type codes after built-in ones (0x01-0x0E)
 _next_type_code = 0x10
 
 
+class QuantizedFloats(list):
+    """
+    A list of floats to pack lossily as 8-bit integers plus one scale factor.
+
+    Opt-in lossy encoding for large float arrays that tolerate some error
+    (ML inputs, telemetry): each item takes 1 byte instead of 9. Items are
+    restored as q * scale, where scale = max(abs(item)) / 127, so each one
+    is off by at most scale / 2. Unpacks to a plain list of floats.
+
+    scale is stored as a float32, so max(abs(item)) must be 0 or between
+    about 1.5e-36 and 4.3e40; packing raises ValueError otherwise.
+
+    Usage:
+        data = typepack.pack(typepack.QuantizedFloats(readings))
+    """
+
+
 def register(cls: Type = None, *, type_code: int = None):
     """
     Register a custom type for serialization.
@@ -78,6 +103,7 @@ def _register_type(cls: Type, type_code: int = None) -> None:
 
     _type_registry[cls] = (type_code, encode_fn, decode_fn)
     _type_code_registry[type_code] = (cls, decode_fn)
+    _specialized_packers.clear()
 
 
 def _is_namedtuple(cls: Type) -> bool:
@@ -148,4 +174,5 @@ def clear_registry() -> None:
     global _next_type_code
     _type_registry.clear()
     _type_code_registry.clear()
+    _specialized_packers.clear()
     _next_type_code = 0x10